@@ -218,18 +218,39 @@ import os
 import sqlite3
 import datetime
 import json
+import hashlib
+import queue
+import atexit
+import time
+import threading
 import traceback
-from flask import Flask, request, g, jsonify, send_from_directory
+import warnings
+from collections import OrderedDict
+from functools import lru_cache
+from flask import Flask, request, g, send_from_directory, abort
 from flask_socketio import SocketIO, emit, join_room
 from flask_cors import CORS
+import numpy as np
 import pandas as pd
 import joblib
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# analysis modules are imported once here so the request path is plain function calls
+from modules.homoglyph import analyze_homoglyph, score_dataset
+from modules.behavior import analyze_behavior  # keep your existing behavior analyzer
+from modules.features import extract_features_from_url, domain_age_days
+from modules.blacklist import load_blacklist, _norm_domain
+
 # Async mode: prefer gevent (Render / Linux). If unavailable fallback.
 async_mode = os.environ.get("ASYNC_MODE", "gevent")
 
 DB_PATH = os.path.join(os.path.dirname(__file__), "phishing_logs.db")
 MODEL_PATH = os.path.join(os.path.dirname(__file__), "rf_model.joblib")
+ONNX_PATH = os.path.join(os.path.dirname(__file__), "rf_model.onnx")
 
 # Serve static frontend from 'web' directory
 app = Flask(__name__, static_folder="web", static_url_path="")
@@ -237,6 +258,26 @@ CORS(app)
 app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "phishguard-final-secret")
 socketio = SocketIO(app, cors_allowed_origins="*", async_mode=async_mode)
 
+# -------------------------
+# JSON helpers (orjson when available, stdlib json otherwise)
+# -------------------------
+def _json(payload):
+    if orjson is not None:
+        body = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    else:
+        body = json.dumps(payload)
+    return app.response_class(body, mimetype="application/json")
+
+def _request_json():
+    raw = request.get_data()
+    if not raw:
+        return {}
+    try:
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    except ValueError:
+        abort(400, description="invalid JSON body")
+    return data or {}
+
 # -------------------------
 # Load model if present (support model saved as dict{'model','columns'})
 # -------------------------
@@ -260,52 +301,151 @@ if os.path.exists(MODEL_PATH):
 else:
     print("⚠️ Model file not found. Run train_model.py to create rf_model.joblib")
 
+# -------------------------
+# Optional ONNX runtime for inference (created by scripts/export_onnx.py)
+# -------------------------
+try:
+    import onnxruntime
+except Exception:
+    onnxruntime = None
+
+class OnnxModel:
+    """predict_proba-compatible wrapper around an onnxruntime session."""
+
+    def __init__(self, session, classes):
+        self.session = session
+        self.classes_ = classes
+        self.input_name = session.get_inputs()[0].name
+
+    def predict_proba(self, X):
+        return self.session.run(["probabilities"], {self.input_name: np.ascontiguousarray(X, dtype=np.float32)})[0]
+
+def load_onnx_model(sk_model):
+    if onnxruntime is None or sk_model is None or not model_columns or not os.path.exists(ONNX_PATH):
+        return None
+    try:
+        session = onnxruntime.InferenceSession(ONNX_PATH, providers=["CPUExecutionProvider"])
+        # only trust the export if it was made from the joblib model we just loaded
+        source_sha1 = session.get_modelmeta().custom_metadata_map.get("source_sha1")
+        with open(MODEL_PATH, "rb") as f:
+            if source_sha1 != hashlib.sha1(f.read()).hexdigest():
+                print("⚠️ rf_model.onnx is stale; using joblib model. Re-run scripts/export_onnx.py")
+                return None
+        print("✅ ONNX runtime model loaded")
+        return OnnxModel(session, sk_model.classes_)
+    except Exception as e:
+        print("⚠️ Could not load ONNX model, using joblib model:", e)
+        return None
+
+model = load_onnx_model(model) or model
+
+# fixed training schema: column index + pre-typed zero row, so requests never build a DataFrame.
+# A bare estimator saved without 'columns' still knows its training order if it was fitted on a DataFrame
+schema_columns = model_columns
+if not schema_columns and getattr(model, "feature_names_in_", None) is not None:
+    schema_columns = [str(c) for c in model.feature_names_in_]
+COL_IDX = {c: i for i, c in enumerate(schema_columns)} if schema_columns else None
+N_COLS = len(schema_columns) if schema_columns else 0
+FEATURE_TEMPLATE = np.zeros((1, N_COLS), dtype=np.float32)
+if COL_IDX is not None:
+    # rows are built in the training column order, so sklearn's name check has nothing to add
+    warnings.filterwarnings("ignore", message="X does not have valid feature names",
+                            category=UserWarning, module=r"sklearn\.")
+
+def build_feature_row(features):
+    if COL_IDX is None:
+        return np.asarray([[v or 0.0 for v in features.values()]], dtype=np.float32)
+    X = FEATURE_TEMPLATE.copy()
+    for k, v in features.items():
+        i = COL_IDX.get(k)
+        if i is not None:
+            X[0, i] = v or 0.0
+    return X
+
+def build_feature_matrix(features_list):
+    if COL_IDX is None:
+        return pd.DataFrame(features_list).fillna(0).to_numpy(dtype=np.float32)
+    X = np.zeros((len(features_list), N_COLS), dtype=np.float32)
+    for r, features in enumerate(features_list):
+        for k, v in features.items():
+            i = COL_IDX.get(k)
+            if i is not None:
+                X[r, i] = v or 0.0
+    return X
+
 # -------------------------
 # DB helpers & migrations
 # -------------------------
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "8"))
+_db_pool = queue.LifoQueue(maxsize=DB_POOL_SIZE)
+
+def _connect_db():
+    db = sqlite3.connect(DB_PATH, check_same_thread=False)
+    # WAL + NORMAL sync keeps commits cheap; busy_timeout avoids "database is locked" under load
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute("PRAGMA busy_timeout=5000")
+    db.execute("PRAGMA temp_store=MEMORY")
+    return db
+
+def init_db():
+    # schema is created once at startup, not on every request
+    db = _connect_db()
+    db.execute(
+        """CREATE TABLE IF NOT EXISTS logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT,
+            url TEXT,
+            homoglyph_score REAL,
+            behavior_score REAL,
+            phishing_score REAL,
+            risk_level TEXT,
+            features_json TEXT,
+            ts DATETIME DEFAULT CURRENT_TIMESTAMP
+        )"""
+    )
+    db.execute(
+        """CREATE TABLE IF NOT EXISTS alerts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT,
+            url TEXT,
+            level TEXT,
+            message TEXT,
+            ts DATETIME DEFAULT CURRENT_TIMESTAMP
+        )"""
+    )
+    db.execute(
+        """CREATE TABLE IF NOT EXISTS blacklist (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            url TEXT UNIQUE,
+            reason TEXT,
+            ts DATETIME DEFAULT CURRENT_TIMESTAMP
+        )"""
+    )
+    db.commit()
+    db.close()
+
 def get_db():
+    # borrow a pooled connection for the request (opens a new one if the pool is empty)
     db = getattr(g, "_database", None)
     if db is None:
-        db = g._database = sqlite3.connect(DB_PATH, check_same_thread=False)
-        # enable row factory if needed
-        db.execute(
-            """CREATE TABLE IF NOT EXISTS logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                session_id TEXT,
-                url TEXT,
-                homoglyph_score REAL,
-                behavior_score REAL,
-                phishing_score REAL,
-                risk_level TEXT,
-                features_json TEXT,
-                ts DATETIME DEFAULT CURRENT_TIMESTAMP
-            )"""
-        )
-        db.execute(
-            """CREATE TABLE IF NOT EXISTS alerts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                session_id TEXT,
-                url TEXT,
-                level TEXT,
-                message TEXT,
-                ts DATETIME DEFAULT CURRENT_TIMESTAMP
-            )"""
-        )
-        db.execute(
-            """CREATE TABLE IF NOT EXISTS blacklist (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                url TEXT UNIQUE,
-                reason TEXT,
-                ts DATETIME DEFAULT CURRENT_TIMESTAMP
-            )"""
-        )
-        db.commit()
+        try:
+            db = _db_pool.get_nowait()
+        except queue.Empty:
+            db = _connect_db()
+        g._database = db
     return db
 
 @app.teardown_appcontext
 def close_db(exc):
-    db = getattr(g, "_database", None)
-    if db is not None:
+    db = g.pop("_database", None)
+    if db is None:
+        return
+    if db.in_transaction:
+        db.rollback()
+    try:
+        _db_pool.put_nowait(db)
+    except queue.Full:
         db.close()
 
 # small helper to add missing column (sqlite supports ADD COLUMN)
@@ -325,7 +465,8 @@ def ensure_migrations():
     cur.close()
     db.close()
 
-# run migrations on startup
+# create schema and run migrations on startup
+init_db()
 ensure_migrations()
 
 # -------------------------
@@ -345,34 +486,200 @@ def serve_assets(filename):
     return send_from_directory(os.path.join(app.static_folder, "assets"), filename)
 
 # -------------------------
-# Import analysis modules (lazy import to avoid startup errors)
+# Trusted domains (cached, reloaded only when the file changes)
 # -------------------------
-from modules.homoglyph import analyze_homoglyph
-from modules.behavior import analyze_behavior  # keep your existing behavior analyzer
-from modules.features import extract_features_from_url, domain_age_days
+TRUSTED_PATH = os.path.join(os.path.dirname(__file__), "trusted_domains.txt")
+_TRUSTED = {"mtime": None, "list": [], "tuple": (), "set": frozenset()}
+
+def get_trusted():
+    try:
+        mtime = os.path.getmtime(TRUSTED_PATH)
+    except OSError:
+        mtime = None
+    if mtime != _TRUSTED["mtime"]:
+        trusted = []
+        if mtime is not None:
+            try:
+                with open(TRUSTED_PATH, "r", encoding="utf-8") as f:
+                    trusted = [x.strip() for x in f if x.strip()]
+            except Exception:
+                trusted = []
+        _TRUSTED.update(mtime=mtime, list=trusted, tuple=tuple(trusted), set=frozenset(trusted))
+    return _TRUSTED["list"]
+
+# -------------------------
+# Per-URL caches (keyed on the trusted list mtime so an edited list invalidates them;
+# the model is loaded once per process, so cached scores live as long as the model)
+# -------------------------
+SCORE_CACHE_SIZE = 16384
+_SCORE_CACHE = OrderedDict()
+_SCORE_CACHE_LOCK = threading.Lock()
+
+@lru_cache(maxsize=8192)
+def _cached_features(url, trusted_mtime):
+    return extract_features_from_url(url, trusted_domains=_TRUSTED["list"])
+
+def get_features(url):
+    # copy: callers add keys (e.g. model_raw_probability) to the returned dict
+    return dict(_cached_features(url, _TRUSTED["mtime"]))
+
+def score_cache_get(url):
+    key = (url, _TRUSTED["mtime"])
+    with _SCORE_CACHE_LOCK:
+        hit = _SCORE_CACHE.get(key)
+        if hit is not None:
+            _SCORE_CACHE.move_to_end(key)
+        return hit
+
+def score_cache_put(url, value):
+    key = (url, _TRUSTED["mtime"])
+    with _SCORE_CACHE_LOCK:
+        _SCORE_CACHE[key] = value
+        _SCORE_CACHE.move_to_end(key)
+        if len(_SCORE_CACHE) > SCORE_CACHE_SIZE:
+            _SCORE_CACHE.popitem(last=False)
+
+def match_known_lists(url, trusted_set):
+    try:
+        host = _norm_domain(url)
+    except Exception:
+        return None
+    if not host:
+        return None
+    if host in load_blacklist():
+        return "blacklist"
+    if host in trusted_set:
+        return "trusted"
+    return None
+
+INSERT_LOG_SQL = "INSERT INTO logs (session_id, url, homoglyph_score, behavior_score, phishing_score, risk_level, features_json, ts) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+INSERT_ALERT_SQL = "INSERT INTO alerts (session_id, url, level, message, ts) VALUES (?, ?, ?, ?, ?)"
+
+# -------------------------
+# Background log writer: requests enqueue (log_row, alert_row_or_None) and return;
+# a single background task (started once below) batches the rows into executemany transactions
+# -------------------------
+LOG_BATCH_MAX = 500
+LOG_FLUSH_INTERVAL = 0.05  # seconds
+LOG_QUEUE_MAX = int(os.environ.get("LOG_QUEUE_MAX", "20000"))  # rows beyond this are dropped, not buffered
+LOG_RETRY_DELAY = 1.0      # seconds between attempts while the DB is unavailable
+
+if async_mode == "gevent":
+    from gevent.queue import Queue as _LogQueue
+else:
+    _LogQueue = queue.Queue
+LOG_Q = _LogQueue(maxsize=LOG_QUEUE_MAX)
+_log_dropped = 0
+
+def _next_log_batch():
+    batch = [LOG_Q.get()]
+    deadline = time.monotonic() + LOG_FLUSH_INTERVAL
+    while len(batch) < LOG_BATCH_MAX:
+        timeout = deadline - time.monotonic()
+        if timeout <= 0:
+            break
+        try:
+            batch.append(LOG_Q.get(timeout=timeout))
+        except queue.Empty:
+            break
+    return batch
+
+def _write_log_batch(db, batch):
+    log_rows = [log_row for log_row, _ in batch]
+    alert_rows = [alert_row for _, alert_row in batch if alert_row is not None]
+    try:
+        with db:
+            db.executemany(INSERT_LOG_SQL, log_rows)
+            if alert_rows:
+                db.executemany(INSERT_ALERT_SQL, alert_rows)
+    except sqlite3.OperationalError:
+        raise  # locked / unavailable DB: nothing was committed, the writer retries the batch
+    except Exception as e:
+        # one bad row rolls back the whole batch; redo it per request so only that row is lost
+        print("DB batch insert error, retrying row by row:", e)
+        for log_row, alert_row in batch:
+            try:
+                with db:
+                    db.execute(INSERT_LOG_SQL, log_row)
+                    if alert_row is not None:
+                        db.execute(INSERT_ALERT_SQL, alert_row)
+            except Exception as e:
+                print("DB insert error:", e)
+
+def _log_writer():
+    db = None
+    while True:
+        batch = _next_log_batch()
+        # keep the batch until it is written: a failed connect or a locked/unavailable DB
+        # is retried instead of ending the task (which would leave LOG_Q with no consumer)
+        while True:
+            try:
+                if db is None:
+                    db = _connect_db()
+                _write_log_batch(db, batch)
+                break
+            except Exception as e:
+                print("[WARN] log writer error, retrying:", e)
+                traceback.print_exc()
+                try:
+                    if db is not None:
+                        db.close()
+                except Exception:
+                    pass
+                db = None
+                socketio.sleep(LOG_RETRY_DELAY)
+
+def _flush_log_queue():
+    # at interpreter exit write whatever the writer has not picked up yet
+    batch = []
+    while True:
+        try:
+            batch.append(LOG_Q.get_nowait())
+        except queue.Empty:
+            break
+    if not batch:
+        return
+    try:
+        db = _connect_db()
+        try:
+            for i in range(0, len(batch), LOG_BATCH_MAX):
+                _write_log_batch(db, batch[i:i + LOG_BATCH_MAX])
+        finally:
+            db.close()
+    except Exception as e:
+        print(f"[WARN] could not flush {len(batch)} queued log rows at exit:", e)
+
+socketio.start_background_task(_log_writer)
+atexit.register(_flush_log_queue)
+
+def enqueue_log(log_row, alert_row=None):
+    global _log_dropped
+    try:
+        LOG_Q.put_nowait((log_row, alert_row))
+    except queue.Full:
+        _log_dropped += 1
+        if _log_dropped % 1000 == 1:
+            print(f"[WARN] log queue full ({LOG_QUEUE_MAX} rows), dropped {_log_dropped} log rows so far")
+
+def classify_risk(phishing_score):
+    if phishing_score < 30:
+        return "Low", "Allow"
+    elif phishing_score < 70:
+        return "Medium", "Warn"
+    return "High", "Block"
 
 # -------------------------
 # API: Check URL
 # -------------------------
 @app.route("/api/check", methods=["POST"])
 def api_check():
-    data = request.json or {}
+    data = _request_json()
     url = data.get("url", "")
     behavior = data.get("behavior", {})
+    if not isinstance(url, str):
+        return _json({"ok": False, "error": "url must be a string"}), 400
 
-    # load trusted domains
-    trusted = []
-    trusted_path = os.path.join(os.path.dirname(__file__), "trusted_domains.txt")
-    try:
-        with open(trusted_path, "r", encoding="utf-8") as f:
-            trusted = [x.strip() for x in f if x.strip()]
-    except Exception:
-        trusted = []
-
-    try:
-        homoglyph_score = analyze_homoglyph(url, trusted)
-    except Exception:
-        homoglyph_score = 0.0
+    get_trusted()  # refresh _TRUSTED when the file changed
 
     try:
         behavior_score = analyze_behavior(behavior)
@@ -380,82 +687,82 @@ def api_check():
         behavior_score = 0.0
 
     features = {}
+    homoglyph_score = 0.0
     phishing_score = None
     prediction = None
 
-    if model:
-        try:
-            features = extract_features_from_url(url, trusted_domains=trusted)
-            X_df = pd.DataFrame([features]).fillna(0)
-
-            # align to training columns if available
-            if model_columns:
-                for c in model_columns:
-                    if c not in X_df.columns:
-                        X_df[c] = 0.0
-                X_df = X_df[model_columns]
-
-            proba = model.predict_proba(X_df)[0]
-            if len(proba) == 1:
-                single_class = model.classes_[0]
-                probability = float(proba[0]) if single_class == 1 else 1.0 - float(proba[0])
-            else:
-                probability = float(proba[1])
-
-            # Blend ML probability with homoglyph_score (heuristic)
-            phishing_score = round((probability * 0.75) + (homoglyph_score * 0.25), 2)
-            prediction = int(model.predict(X_df)[0])
-            # include debug log
-            print(f"[DEBUG] ML raw probability for {url}: {probability:.6f}, homoglyph_score: {homoglyph_score}, blended_percent: {phishing_score}%, label_pred: {prediction}")
-            features["model_raw_probability"] = probability
-        except Exception as e:
-            print("[WARN] model inference error:", e)
-            traceback.print_exc()
-            phishing_score = round(0.7 * homoglyph_score + 0.3 * behavior_score, 2)
-            prediction = 1 if phishing_score >= 50 else 0
+    # known answers first: exact blacklist / trusted hits skip homoglyph analysis and the model
+    list_match = match_known_lists(url, _TRUSTED["set"])
+    if list_match == "blacklist":
+        phishing_score, prediction = 100.0, 1
+        features = {"list_match": list_match}
+    elif list_match == "trusted":
+        phishing_score, prediction = 0.0, 0
+        features = {"list_match": list_match}
     else:
-        phishing_score = round(0.7 * homoglyph_score + 0.3 * behavior_score, 2)
-        prediction = 1 if phishing_score >= 50 else 0
+        # repeated URLs reuse the homoglyph score, features and model output
+        cached = score_cache_get(url)
+        if cached is not None:
+            homoglyph_score, probability, prediction, features = cached
+            phishing_score = round((probability * 0.75) + (homoglyph_score * 0.25), 2)
+        else:
+            try:
+                homoglyph_score = analyze_homoglyph(url, _TRUSTED["tuple"], _TRUSTED["set"])
+            except Exception:
+                homoglyph_score = 0.0
+
+            if model:
+                try:
+                    features = get_features(url)
+                    X = build_feature_row(features)
+
+                    proba = model.predict_proba(X)[0]
+                    if len(proba) == 1:
+                        single_class = model.classes_[0]
+                        probability = float(proba[0]) if single_class == 1 else 1.0 - float(proba[0])
+                    else:
+                        probability = float(proba[1])
+
+                    # Blend ML probability with homoglyph_score (heuristic)
+                    phishing_score = round((probability * 0.75) + (homoglyph_score * 0.25), 2)
+                    # predict() is argmax over predict_proba(); reuse it instead of traversing the trees again
+                    prediction = int(model.classes_[int(np.argmax(proba))])
+                    # include debug log
+                    print(f"[DEBUG] ML raw probability for {url}: {probability:.6f}, homoglyph_score: {homoglyph_score}, blended_percent: {phishing_score}%, label_pred: {prediction}")
+                    features["model_raw_probability"] = probability
+                    score_cache_put(url, (homoglyph_score, probability, prediction, features))
+                except Exception as e:
+                    print("[WARN] model inference error:", e)
+                    traceback.print_exc()
+                    phishing_score = round(0.7 * homoglyph_score + 0.3 * behavior_score, 2)
+                    prediction = 1 if phishing_score >= 50 else 0
+            else:
+                phishing_score = round(0.7 * homoglyph_score + 0.3 * behavior_score, 2)
+                prediction = 1 if phishing_score >= 50 else 0
 
     # classification
-    if phishing_score < 30:
-        risk, action = "Low", "Allow"
-    elif phishing_score < 70:
-        risk, action = "Medium", "Warn"
-    else:
-        risk, action = "High", "Block"
-
-    # Save to DB (store features JSON for retraining)
-    db = get_db()
-    try:
-        db.execute(
-            "INSERT INTO logs (session_id, url, homoglyph_score, behavior_score, phishing_score, risk_level, features_json, ts) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-            (
-                "static",
-                url,
-                homoglyph_score,
-                behavior_score,
-                phishing_score,
-                risk,
-                json.dumps(features),
-                datetime.datetime.utcnow().isoformat(),
-            ),
-        )
-        db.commit()
-    except Exception as e:
-        print("DB insert error:", e)
+    risk, action = classify_risk(phishing_score)
 
+    # Save to DB (store features JSON for retraining) — written by the background log writer
+    now = datetime.datetime.utcnow().isoformat()
+    alert_row = None
     if risk in ("Medium", "High"):
-        try:
-            db.execute(
-                "INSERT INTO alerts (session_id, url, level, message, ts) VALUES (?, ?, ?, ?, ?)",
-                ("static", url, risk, f"{risk} risk detected for {url}", datetime.datetime.utcnow().isoformat()),
-            )
-            db.commit()
-        except Exception:
-            pass
+        alert_row = ("static", url, risk, f"{risk} risk detected for {url}", now)
+    enqueue_log(
+        (
+            "static",
+            url,
+            homoglyph_score,
+            behavior_score,
+            phishing_score,
+            risk,
+            json.dumps(features),
+            now,
+        ),
+        alert_row,
+    )
 
-    return jsonify(
+    return _json(
         {
             "url": url,
             "homoglyph_score": round(homoglyph_score, 2),
@@ -467,77 +774,159 @@ def api_check():
         }
     )
 
+# -------------------------
+# API: Check a batch of URLs (one model call, rows go through the log writer)
+# -------------------------
+MAX_BATCH = int(os.environ.get("MAX_BATCH", "500"))  # urls per request; bounds extraction work and log rows
+
+@app.route("/api/check_batch", methods=["POST"])
+def api_check_batch():
+    data = _request_json()
+    urls = data.get("urls") or []
+    behavior = data.get("behavior", {})
+    if not isinstance(urls, list) or not all(isinstance(u, str) for u in urls):
+        return _json({"ok": False, "error": "urls must be a list of strings"}), 400
+    if len(urls) > MAX_BATCH:
+        return _json({"ok": False, "error": f"at most {MAX_BATCH} urls per batch"}), 400
+
+    get_trusted()  # refresh _TRUSTED when the file changed
+
+    try:
+        behavior_score = analyze_behavior(behavior)
+    except Exception:
+        behavior_score = 0.0
+
+    # same known-list answers as /api/check; only unmatched urls are analyzed and scored
+    list_matches = [match_known_lists(url, _TRUSTED["set"]) for url in urls]
+
+    # one url x trusted similarity matrix for all unmatched urls instead of a scan per url
+    homoglyph_arr = np.zeros(len(urls), dtype=np.float64)
+    unmatched = [i for i, list_match in enumerate(list_matches) if not list_match]
+    if unmatched:
+        try:
+            homoglyph_arr[unmatched] = score_dataset([urls[i] for i in unmatched], _TRUSTED["tuple"])
+        except Exception as e:
+            print("[WARN] batch homoglyph scoring error:", e)
+    homoglyph_scores = homoglyph_arr.tolist()
+
+    features_list = [{} for _ in urls]
+    # heuristic score for every url; rows the model scores below are overwritten
+    phishing_scores = np.round(0.7 * homoglyph_arr + 0.3 * behavior_score, 2)
+
+    if model and urls:
+        # a url whose features fail keeps the heuristic score without taking the others with it
+        scored = []
+        for i, url in enumerate(urls):
+            if list_matches[i]:
+                continue
+            try:
+                features_list[i] = get_features(url)
+                scored.append(i)
+            except Exception as e:
+                print(f"[WARN] feature extraction error for {url}:", e)
+        if scored:
+            try:
+                proba = model.predict_proba(build_feature_matrix([features_list[i] for i in scored]))
+                if proba.shape[1] == 1:
+                    probability = proba[:, 0] if model.classes_[0] == 1 else 1.0 - proba[:, 0]
+                else:
+                    probability = proba[:, 1]
+
+                phishing_scores[scored] = np.round((probability * 0.75) + (homoglyph_arr[scored] * 0.25), 2)
+                for i, p in zip(scored, probability):
+                    features_list[i]["model_raw_probability"] = float(p)
+            except Exception as e:
+                print("[WARN] batch model inference error:", e)
+                traceback.print_exc()
+                for i in scored:
+                    features_list[i] = {}
+
+    for i, list_match in enumerate(list_matches):
+        if list_match:
+            phishing_scores[i] = 100.0 if list_match == "blacklist" else 0.0
+            features_list[i] = {"list_match": list_match}
+
+    now = datetime.datetime.utcnow().isoformat()
+    results = []
+    for url, homoglyph_score, phishing_score, features in zip(urls, homoglyph_scores, phishing_scores.tolist(), features_list):
+        risk, action = classify_risk(phishing_score)
+        alert_row = None
+        if risk in ("Medium", "High"):
+            alert_row = ("static", url, risk, f"{risk} risk detected for {url}", now)
+        enqueue_log(("static", url, homoglyph_score, behavior_score, phishing_score, risk, json.dumps(features), now), alert_row)
+        results.append(
+            {
+                "url": url,
+                "homoglyph_score": round(homoglyph_score, 2),
+                "behavior_score": round(behavior_score, 2),
+                "phishing_score": phishing_score,
+                "risk_level": risk,
+                "action": action,
+                "features": features,
+            }
+        )
+
+    return _json({"results": results})
+
 # -------------------------
 # API: Block / Unblock URL (blacklist)
 # -------------------------
 @app.route("/api/block", methods=["POST"])
 def api_block():
-    data = request.json or {}
+    data = _request_json()
     url = data.get("url", "")
     reason = data.get("reason", "blocked by admin")
     if not url:
-        return jsonify({"ok": False, "error": "no url"}), 400
+        return _json({"ok": False, "error": "no url"}), 400
     db = get_db()
     try:
         db.execute("INSERT OR IGNORE INTO blacklist (url, reason, ts) VALUES (?, ?, ?)", (url, reason, datetime.datetime.utcnow().isoformat()))
         db.commit()
-        return jsonify({"ok": True, "url": url})
+        return _json({"ok": True, "url": url})
     except Exception as e:
-        return jsonify({"ok": False, "error": str(e)}), 500
+        return _json({"ok": False, "error": str(e)}), 500
 
 @app.route("/api/unblock", methods=["POST"])
 def api_unblock():
-    data = request.json or {}
+    data = _request_json()
     url = data.get("url", "")
     if not url:
-        return jsonify({"ok": False, "error": "no url"}), 400
+        return _json({"ok": False, "error": "no url"}), 400
     db = get_db()
     try:
         db.execute("DELETE FROM blacklist WHERE url = ?", (url,))
         db.commit()
-        return jsonify({"ok": True, "url": url})
+        return _json({"ok": True, "url": url})
     except Exception as e:
-        return jsonify({"ok": False, "error": str(e)}), 500
+        return _json({"ok": False, "error": str(e)}), 500
 
 @app.route("/api/blacklist")
 def api_blacklist():
     db = get_db()
     cur = db.execute("SELECT url, reason, ts FROM blacklist ORDER BY id DESC")
     rows = cur.fetchall()
-    return jsonify({"blacklist": [list(r) for r in rows]})
+    return _json({"blacklist": [list(r) for r in rows]})
 
 # -------------------------
 # Optional debug endpoint to inspect features (helps debugging on Render)
 # -------------------------
 @app.route("/api/debug_features", methods=["POST"])
 def api_debug_features():
-    data = request.json or {}
+    data = _request_json()
     url = data.get("url", "")
-    trusted = []
-    trusted_path = os.path.join(os.path.dirname(__file__), "trusted_domains.txt")
-    try:
-        with open(trusted_path, "r", encoding="utf-8") as f:
-            trusted = [x.strip() for x in f if x.strip()]
-    except Exception:
-        trusted = []
-    features = extract_features_from_url(url, trusted_domains=trusted)
+    get_trusted()
+    features = get_features(url)
     model_present = model is not None
     model_cols_present = model_columns is not None
     proba = None
     prob_class1 = None
     try:
         if model:
-            X_df = pd.DataFrame([features]).fillna(0)
-            if model_columns:
-                for c in model_columns:
-                    if c not in X_df.columns:
-                        X_df[c] = 0.0
-                X_df = X_df[model_columns]
-            proba = model.predict_proba(X_df)[0].tolist()
+            proba = model.predict_proba(build_feature_row(features))[0].tolist()
             prob_class1 = float(proba[1]) if len(proba) > 1 else None
     except Exception as e:
         proba = str(e)
-    return jsonify({"url": url, "features": features, "model_loaded": bool(model), "model_columns_present": bool(model_columns), "predict_proba": proba, "probability_class1": prob_class1})
+    return _json({"url": url, "features": features, "model_loaded": bool(model), "model_columns_present": bool(model_columns), "predict_proba": proba, "probability_class1": prob_class1})
 
 # -------------------------
 # SocketIO (kept minimal)
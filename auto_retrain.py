@@ -4,7 +4,7 @@ import json
 import os
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import HistGradientBoostingClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, accuracy_score
 import joblib
@@ -20,11 +20,9 @@ RANDOM_STATE = 42
 
 def fetch_labeled_examples(conn):
     # this expects that logs.features_json contains a dict including a numeric 'label' field
-    cur = conn.cursor()
-    cur.execute("SELECT url, features_json FROM logs WHERE features_json IS NOT NULL")
-    rows = cur.fetchall()
+    cur = conn.execute("SELECT url, features_json FROM logs WHERE features_json IS NOT NULL ORDER BY id")
     data = []
-    for url, features_json in rows:
+    for url, features_json in cur:
         try:
             feats = json.loads(features_json)
             # label: either included in features (if you manually added), else attempt to heuristically label:
@@ -61,7 +59,8 @@ def prepare_dataset(data):
 
 def train_and_save(X, y):
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y if len(set(y))>1 else None)
-    model = RandomForestClassifier(n_estimators=200, random_state=RANDOM_STATE)
+    # histogram-binned (uint8) gradient boosting: faster fit and cheaper inference than a 200-tree forest
+    model = HistGradientBoostingClassifier(max_iter=200, random_state=RANDOM_STATE)
     model.fit(X_train, y_train)
     y_pred = model.predict(X_test)
     print("Accuracy:", accuracy_score(y_test, y_pred))
@@ -1,5 +1,4 @@
 import sqlite3
-import pandas as pd
 from pathlib import Path
 
 # Path to your SQLite database
@@ -12,20 +11,25 @@ else:
 
     # Connect to database
     conn = sqlite3.connect(DB_PATH)
-    
+
     # Show available tables
-    tables = pd.read_sql_query("SELECT name FROM sqlite_master WHERE type='table';", conn)
+    tables = [r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table';")]
     print("\n📋 Tables in DB:\n", tables)
 
-    # Load data from logs table
-    df = pd.read_sql_query("SELECT * FROM logs;", conn)
-    print(f"\n✅ Loaded {len(df)} rows from 'logs' table")
+    # index lets the score filter seek instead of scanning every log row; no ORDER BY,
+    # which would force a full scan (urls then come out in score order, not insert order)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_score ON logs(phishing_score)")
+    conn.commit()
 
-    # Export suspicious URLs (phishing_score > 70)
-    suspicious = df[df['phishing_score'] > 70]
+    # Export suspicious URLs (phishing_score > 70), streamed straight from the cursor
+    cur = conn.execute("SELECT url FROM logs WHERE phishing_score > 70 AND url IS NOT NULL")
     Path("data").mkdir(exist_ok=True)
-    suspicious['url'].dropna().to_csv("data/phish_raw.txt", index=False, header=False)
+    exported = 0
+    with open("data/phish_raw.txt", "w", encoding="utf-8") as f:
+        for (url,) in cur:
+            f.write(url + "\n")
+            exported += 1
 
-    print(f"\n💾 Exported {len(suspicious)} suspicious URLs to data/phish_raw.txt")
+    print(f"\n💾 Exported {exported} suspicious URLs to data/phish_raw.txt")
 
     conn.close()
@@ -7,6 +7,9 @@ LOCK = threading.Lock()
 ROOT = os.path.dirname(os.path.dirname(__file__))  # project root if modules/ is at projectroot/modules
 BLACKLIST_PATH = os.path.join(ROOT, "blacklist.txt")
 
+# in-memory copy of blacklist.txt; reread only when the file's mtime changes
+_CACHE = {"mtime": None, "set": frozenset()}
+
 def _ensure_file():
     if not os.path.exists(BLACKLIST_PATH):
         with open(BLACKLIST_PATH, "w", encoding="utf-8") as f:
@@ -25,12 +28,20 @@ def _norm_domain(url_or_domain: str) -> str:
     except Exception:
         return url_or_domain.lower()
 
-def load_blacklist() -> set:
-    _ensure_file()
-    with LOCK:
+def _load_locked() -> frozenset:
+    # caller must hold LOCK
+    mtime = os.path.getmtime(BLACKLIST_PATH)
+    if mtime != _CACHE["mtime"]:
         with open(BLACKLIST_PATH, "r", encoding="utf-8") as f:
             lines = [l.strip().lower() for l in f if l.strip()]
-    return set(lines)
+        _CACHE["set"] = frozenset(lines)
+        _CACHE["mtime"] = mtime
+    return _CACHE["set"]
+
+def load_blacklist() -> frozenset:
+    _ensure_file()
+    with LOCK:
+        return _load_locked()
 
 def is_blacklisted(url_or_domain: str) -> bool:
     d = _norm_domain(url_or_domain)
@@ -46,11 +57,14 @@ def add_to_blacklist(url_or_domain: str, reason: str = "") -> bool:
         return False
     _ensure_file()
     with LOCK:
-        blacks = load_blacklist()
+        blacks = _load_locked()
         if d in blacks:
             return False
         # append
         with open(BLACKLIST_PATH, "a", encoding="utf-8") as f:
             f.write(d + "\n")
+        # update the cache in place so the append does not trigger a reread
+        _CACHE["set"] = blacks | {d}
+        _CACHE["mtime"] = os.path.getmtime(BLACKLIST_PATH)
         # optionally write a reason file? Keep simple for now.
     return True
@@ -1,10 +1,11 @@
 # modules/features.py
 import re
-import math
+import numpy as np
 import idna
 import unicodedata
-from collections import Counter
+from functools import lru_cache
 import datetime
+from difflib import SequenceMatcher
 
 # optional whois import (may fail if system cannot resolve whois)
 try:
@@ -12,10 +13,21 @@ try:
 except Exception:
     pywhois = None
 
+# optional rapidfuzz import (C Levenshtein across all trusted slds in one call)
+try:
+    from rapidfuzz import process as rf_process
+    from rapidfuzz.distance import Levenshtein as rf_levenshtein
+except Exception:
+    rf_process = None
+    rf_levenshtein = None
+
+_SCHEME_RE = re.compile(r'^https?://')
+_IPV4_RE = re.compile(r'^\d+\.\d+\.\d+\.\d+$')
+
 # -------------------------
 # basic helpers
 # -------------------------
-def levenshtein(a: str, b: str) -> int:
+def _levenshtein_py(a: str, b: str) -> int:
     if a == b: return 0
     la, lb = len(a), len(b)
     if la == 0: return lb
@@ -31,6 +43,53 @@ def levenshtein(a: str, b: str) -> int:
         prev = cur
     return prev[lb]
 
+def _lev_loop(a, b):
+    # two-row dp over code point arrays; compiled with numba by _load_levenshtein
+    la, lb = a.shape[0], b.shape[0]
+    prev = np.arange(lb + 1, dtype=np.int32)
+    cur = np.empty(lb + 1, dtype=np.int32)
+    for i in range(1, la + 1):
+        cur[0] = i
+        ca = a[i - 1]
+        for j in range(1, lb + 1):
+            add = prev[j] + 1
+            delete = cur[j - 1] + 1
+            change = prev[j - 1] + (0 if ca == b[j - 1] else 1)
+            cur[j] = min(add, delete, change)
+        prev, cur = cur, prev
+    return prev[lb]
+
+def _codepoints(s: str) -> np.ndarray:
+    # utf-32 keeps one element per character, so distances match the pure python version
+    return np.frombuffer(s.encode('utf-32-le'), dtype=np.uint32)
+
+def _load_levenshtein():
+    # optional numba (JIT for the inner loop). Imported and compiled on first use only:
+    # with rapidfuzz installed levenshtein() is never called, and app / joblib workers
+    # should not pay numba's import and compile time
+    try:
+        from numba import njit
+        lev_nb = njit(cache=True)(_lev_loop)
+
+        def lev(a: str, b: str) -> int:
+            if a == b: return 0
+            if not a: return len(b)
+            if not b: return len(a)
+            return int(lev_nb(_codepoints(a), _codepoints(b)))
+
+        lev('warm', 'up')  # compile (or load the cached build) now rather than mid-request
+        return lev
+    except Exception:
+        return _levenshtein_py
+
+_LEV_IMPL = None
+
+def levenshtein(a: str, b: str) -> int:
+    global _LEV_IMPL
+    if _LEV_IMPL is None:
+        _LEV_IMPL = _load_levenshtein()
+    return _LEV_IMPL(a, b)
+
 def to_ascii(domain: str) -> str:
     try:
         return idna.encode(domain).decode()
@@ -39,26 +98,69 @@ def to_ascii(domain: str) -> str:
 
 def shannon_entropy(s: str) -> float:
     if not s: return 0.0
-    counts = Counter(s)
-    probs = [c/len(s) for c in counts.values()]
-    return -sum(p*math.log2(p) for p in probs)
+    if s.isascii():
+        counts = np.bincount(np.frombuffer(s.encode('ascii'), dtype=np.uint8))
+        counts = counts[counts > 0]
+    else:
+        # count code points (not utf-8 bytes) so non-ascii hosts keep the same entropy
+        _, counts = np.unique(np.frombuffer(s.encode('utf-32-le'), dtype=np.uint32), return_counts=True)
+    p = counts / len(s)
+    return float(-(p * np.log2(p)).sum())
 
 def count_non_ascii(s: str) -> int:
     return sum(1 for ch in s if ord(ch) > 127)
 
+_ASCII_DIGITS = b'0123456789'
+_ASCII_LETTERS = b'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+def char_class_counts(s: str):
+    # digits, letters, non-alphanumerics and non-ascii chars
+    if s.isascii():
+        # ascii fast path: count class members by how many bytes translate() deletes
+        b = s.encode('ascii')
+        n = len(b)
+        digits = n - len(b.translate(None, _ASCII_DIGITS))
+        letters = n - len(b.translate(None, _ASCII_LETTERS))
+        return digits, letters, n - digits - letters, 0
+    # unicode: single pass with the str class tests
+    digits = letters = special = non_ascii = 0
+    for ch in s:
+        if ch.isdigit():
+            digits += 1
+        if ch.isalpha():
+            letters += 1
+        if not ch.isalnum():
+            special += 1
+        if ord(ch) > 127:
+            non_ascii += 1
+    return digits, letters, special, non_ascii
+
 HOMOGLYPH_MAP = {
     '0':'o', '1':'l', '3':'e', '4':'a', '5':'s', '7':'t', '8':'b',
     'l':'1', 'o':'0', 'i':'1', 's':'5', 'a':'4'
 }
+# deletion table for every char whose lowercase form is in HOMOGLYPH_MAP;
+# the count is how many chars translate() drops
+_HOMOGLYPH_DELETE = str.maketrans({ch: None for k in HOMOGLYPH_MAP for ch in (k, k.upper())})
+
 def homoglyph_sub_count(domain: str) -> int:
-    c = 0
-    for ch in domain:
-        if ch.lower() in HOMOGLYPH_MAP:
-            c += 1
-    return c
+    return len(domain) - len(domain.translate(_HOMOGLYPH_DELETE))
+
+_CONFUSABLES_TABLE = str.maketrans({'\u0430':'a','\u03B1':'a','\u0435':'e','\u03B5':'e','\u043E':'o','\u03BF':'o','\uFF4F':'o','\u0131':'i','\u0456':'i','0':'o','1':'l'})
 
 SUSPICIOUS_TLDS = {'.zip', '.top', '.xyz', '.country', '.info', '.icu', '.loan'}
 
+@lru_cache(maxsize=32)
+def trusted_slds(trusted_domains: tuple) -> tuple:
+    return tuple(t.split('.')[0].lower() for t in trusted_domains)
+
+def min_levenshtein(s: str, candidates: tuple) -> int:
+    if not candidates:
+        return -1
+    if rf_process is not None:
+        return int(rf_process.extractOne(s, candidates, scorer=rf_levenshtein.distance)[1])
+    return min(levenshtein(s, t) for t in candidates)
+
 def extract_sld(host: str) -> str:
     parts = host.split('.')
     if len(parts) >= 2:
@@ -70,7 +172,7 @@ def domain_age_days(hostname: str, fallback_max=36500):
     if not hostname:
         return None
     # strip path
-    host = re.sub(r'^https?://', '', hostname).split('/')[0].split(':')[0]
+    host = _SCHEME_RE.sub('', hostname).split('/')[0].split(':')[0]
     if pywhois is None:
         return None
     try:
@@ -91,39 +193,26 @@ def domain_age_days(hostname: str, fallback_max=36500):
 # -------------------------
 # Main extractor
 # -------------------------
-def extract_features_from_url(url: str, trusted_domains: list = None) -> dict:
+def url_host(url: str) -> str:
     host = (url or "").lower().strip()
-    host = re.sub(r'^https?://', '', host)
+    host = _SCHEME_RE.sub('', host)
     host = host.split('/')[0]
     host = host.split(':')[0]
+    return host
 
-    parts = host.split('.')
-    tld = '.' + parts[-1] if len(parts) > 1 else ''
+def extract_host_features(host: str, trusted_domains: list = None) -> dict:
+    # features that need per-host python work (idna, entropy, whois, trusted similarity);
+    # the plain string counts in extract_features_from_url are vectorized in train_model.py
     sld = extract_sld(host)
     ascii = to_ascii(host)
+    host_len = max(1, len(host))
 
     feats = {}
-    feats['url_length'] = len(url or "")
-    feats['domain_length'] = len(host)
-    feats['sld_length'] = len(sld)
-    feats['num_dots'] = host.count('.')
-    feats['tld_suspicious'] = 1 if tld in SUSPICIOUS_TLDS else 0
-    feats['unicode_chars'] = count_non_ascii(host)
     feats['homoglyph_subs'] = homoglyph_sub_count(host)
     feats['punycode_diff'] = 1 if ascii != host else 0
     feats['shannon_entropy'] = round(shannon_entropy(host), 4)
-    feats['digit_ratio'] = sum(ch.isdigit() for ch in host)/max(1,len(host))
-    feats['alpha_ratio'] = sum(ch.isalpha() for ch in host)/max(1,len(host))
-    feats['count_digits'] = sum(ch.isdigit() for ch in host)
-    feats['count_letters'] = sum(ch.isalpha() for ch in host)
-    feats['count_special'] = sum(not ch.isalnum() for ch in host)
-    feats['has_https'] = 1 if url.startswith("https") else 0
-    feats['has_at'] = 1 if '@' in url else 0
-    feats['has_hyphen'] = 1 if '-' in host else 0
-    feats['has_ip'] = 1 if re.match(r'^\d+\.\d+\.\d+\.\d+$', sld) else 0
-    feats['unique_char_ratio'] = len(set(host))/max(1,len(host))
-    # ratio from full host length to sld length
-    feats['ratio_to_sld'] = round(len(sld)/max(1,len(host)), 4)
+    feats['has_ip'] = 1 if _IPV4_RE.match(sld) else 0
+    feats['unique_char_ratio'] = len(set(host))/host_len
 
     # domain age (days)
     try:
@@ -136,18 +225,13 @@ def extract_features_from_url(url: str, trusted_domains: list = None) -> dict:
     if trusted_domains:
         best_sim_norm = 0.0
         best_sim_raw = 0.0
-        min_lev = 999
         raw = host
-        # create a simple normalized form that maps some confusables to ascii
-        def normalize_confusables(s):
-            mapping = {'\u0430':'a','\u03B1':'a','\u0435':'e','\u03B5':'e','\u043E':'o','\u03BF':'o','\uFF4F':'o','\u0131':'i','\u0456':'i','0':'o','1':'l'}
-            return ''.join([mapping.get(ch, ch) for ch in s])
-        norm = normalize_confusables(raw)
-        for t in trusted_domains:
-            t_sld = t.split('.')[0].lower()
+        # simple normalized form that maps some confusables to ascii
+        norm = raw.translate(_CONFUSABLES_TABLE)
+        t_slds = trusted_slds(tuple(trusted_domains))
+        for t_sld in t_slds:
             # similarity via ratio
             try:
-                from difflib import SequenceMatcher
                 sim_norm = SequenceMatcher(None, norm, t_sld).ratio()
                 sim_raw = SequenceMatcher(None, raw, t_sld).ratio()
                 if sim_norm > best_sim_norm:
@@ -156,18 +240,47 @@ def extract_features_from_url(url: str, trusted_domains: list = None) -> dict:
                     best_sim_raw = sim_raw
             except Exception:
                 pass
-            try:
-                d = levenshtein(sld, t_sld)
-                if d < min_lev:
-                    min_lev = d
-            except Exception:
-                pass
+        try:
+            min_lev = min_levenshtein(sld, t_slds)
+        except Exception:
+            min_lev = -1
         feats['best_sim_trusted_norm'] = round(best_sim_norm, 4)
         feats['best_sim_trusted_raw'] = round(best_sim_raw, 4)
-        feats['min_lev_trusted'] = min_lev if min_lev != 999 else -1
+        feats['min_lev_trusted'] = min_lev
     else:
         feats['best_sim_trusted_norm'] = 0.0
         feats['best_sim_trusted_raw'] = 0.0
         feats['min_lev_trusted'] = -1
 
     return feats
+
+def extract_features_from_url(url: str, trusted_domains: list = None) -> dict:
+    host = url_host(url)
+
+    parts = host.split('.')
+    tld = '.' + parts[-1] if len(parts) > 1 else ''
+    sld = extract_sld(host)
+
+    n_digits, n_letters, n_special, n_non_ascii = char_class_counts(host)
+    host_len = max(1, len(host))
+
+    feats = {}
+    feats['url_length'] = len(url or "")
+    feats['domain_length'] = len(host)
+    feats['sld_length'] = len(sld)
+    feats['num_dots'] = host.count('.')
+    feats['tld_suspicious'] = 1 if tld in SUSPICIOUS_TLDS else 0
+    feats['unicode_chars'] = n_non_ascii
+    feats['digit_ratio'] = n_digits/host_len
+    feats['alpha_ratio'] = n_letters/host_len
+    feats['count_digits'] = n_digits
+    feats['count_letters'] = n_letters
+    feats['count_special'] = n_special
+    feats['has_https'] = 1 if url.startswith("https") else 0
+    feats['has_at'] = 1 if '@' in url else 0
+    feats['has_hyphen'] = 1 if '-' in host else 0
+    # ratio from full host length to sld length
+    feats['ratio_to_sld'] = round(len(sld)/host_len, 4)
+
+    feats.update(extract_host_features(host, trusted_domains))
+    return feats
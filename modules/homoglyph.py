@@ -1,7 +1,15 @@
 # modules/homoglyph.py
-import re
 from difflib import SequenceMatcher
 import urllib.parse
+from functools import lru_cache
+import numpy as np
+
+# optional rapidfuzz import (C++ ratio over the whole trusted list; difflib fallback below)
+try:
+    from rapidfuzz import process as rf_process, fuzz as rf_fuzz
+except Exception:
+    rf_process = None
+    rf_fuzz = None
 
 # small mapping of confusables (extend when needed)
 CONFUSABLES = {
@@ -10,12 +18,15 @@ CONFUSABLES = {
     '\u0456':'i','0':'o','1':'l'
 }
 
+_CONFUSABLE_TABLE = str.maketrans(CONFUSABLES)
+
 def normalize_confusables(s: str) -> str:
-    return ''.join([CONFUSABLES.get(ch, ch) for ch in s])
+    return s.translate(_CONFUSABLE_TABLE)
 
+@lru_cache(maxsize=200_000)
 def extract_domain(url: str) -> str:
     if not url: return ''
-    if not re.match(r'https?://', url):
+    if not url.startswith(('http://', 'https://')):
         url = 'http://' + url
     try:
         p = urllib.parse.urlparse(url)
@@ -24,24 +35,50 @@ def extract_domain(url: str) -> str:
         return url.lower()
 
 def best_similarity(a: str, b_list: list) -> float:
+    if rf_process is not None:
+        match = rf_process.extractOne(a, b_list, scorer=rf_fuzz.ratio, processor=None, score_cutoff=0)
+        return match[1] / 100.0 if match else 0.0
+    # ratio() <= 2*min(la, lt)/(la + lt): skip candidates whose length alone rules out
+    # beating the best so far; closest lengths first so best rises early
+    la = len(a)
     best = 0.0
-    for t in b_list:
+    for t in sorted(b_list, key=lambda t: abs(len(t) - la)):
         try:
+            lt = len(t)
+            if la + lt and 2 * min(la, lt) / (la + lt) <= best:
+                continue
             r = SequenceMatcher(None, a, t).ratio()
             if r > best: best = r
         except Exception:
             pass
     return best
 
-def analyze_homoglyph(url: str, trusted_domains: list) -> float:
+@lru_cache(maxsize=32)
+def _trusted_set(trusted_domains: tuple) -> frozenset:
+    return frozenset(trusted_domains)
+
+def analyze_homoglyph(url: str, trusted_domains, trusted_set: frozenset = None) -> float:
+    """trusted_domains is scanned for similarity; trusted_set (derived from it when
+    not given) answers the exact-match allow check in O(1). Pass the same tuple on
+    every call (app.py keeps one per trusted-file load) so cache entries share it."""
     domain = extract_domain(url)
     if not domain:
         return 0.0
-    raw = domain
-    normalized = normalize_confusables(raw)
+    if not isinstance(trusted_domains, tuple):
+        trusted_domains = tuple(trusted_domains or ())
+    if trusted_set is None:
+        trusted_set = _trusted_set(trusted_domains)
     # quick allow if identical and trusted
-    if normalized == raw and normalized in trusted_domains:
+    if domain in trusted_set and normalize_confusables(domain) == domain:
         return 0.0
+    return _analyze_homoglyph_cached(domain, trusted_domains)
+
+# the score depends only on the domain and the trusted list, and the same domains
+# repeat heavily in datasets and live traffic
+@lru_cache(maxsize=200_000)
+def _analyze_homoglyph_cached(domain: str, trusted_domains: tuple) -> float:
+    raw = domain
+    normalized = normalize_confusables(raw)
 
     sim_norm = best_similarity(normalized, trusted_domains) if trusted_domains else 0.0
     sim_raw = best_similarity(raw, trusted_domains) if trusted_domains else 0.0
@@ -63,3 +100,59 @@ def analyze_homoglyph(url: str, trusted_domains: list) -> float:
         score += 10
 
     return min(100.0, max(0.0, score))
+
+def _similarity_matrix(queries: list, trusted: tuple) -> np.ndarray:
+    # (len(queries), len(trusted)) ratio matrix in [0, 1]
+    if rf_process is not None:
+        m = rf_process.cdist(queries, trusted, scorer=rf_fuzz.ratio, processor=None,
+                             dtype=np.float64, workers=-1)
+        return m / 100.0
+    return np.array([[SequenceMatcher(None, q, t).ratio() for t in trusted] for q in queries],
+                    dtype=np.float64).reshape(len(queries), len(trusted))
+
+def score_dataset(urls: list, trusted: list) -> np.ndarray:
+    """analyze_homoglyph over a whole list of urls, with the similarity scans done as
+    one url x trusted matrix; returns a float array aligned with urls."""
+    raw = [extract_domain(u) for u in urls]
+    norm = [normalize_confusables(d) for d in raw]
+    trusted = tuple(trusted or ())
+    n = len(raw)
+
+    if trusted and n:
+        sim_raw = _similarity_matrix(raw, trusted).max(axis=1)
+        sim_norm = _similarity_matrix(norm, trusted).max(axis=1)
+    else:
+        sim_raw = np.zeros(n)
+        sim_norm = np.zeros(n)
+
+    # per-domain counts from one code point array: prefix sums over the masks, differenced
+    # at the domain boundaries
+    lengths = np.fromiter(map(len, raw), dtype=np.int64, count=n)
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    cps = np.frombuffer(''.join(raw).encode('utf-32-le'), dtype=np.uint32)
+
+    def per_domain(mask):
+        csum = np.concatenate(([0], np.cumsum(mask, dtype=np.int64)))
+        return csum[ends] - csum[starts]
+
+    has_unicode = per_domain(cps > 127) > 0
+    digits = per_domain((cps >= 48) & (cps <= 57))
+    # str.isdigit also counts non-ascii digits; only unicode domains can have any
+    for i in np.flatnonzero(has_unicode):
+        digits[i] = sum(c.isdigit() for c in raw[i])
+    digit_ratio = digits / np.maximum(1, lengths)
+
+    score = np.zeros(n)
+    score += np.where((sim_norm >= 0.85) & (sim_raw < sim_norm - 0.05), 80 * sim_norm, 0.0)
+    score += np.where(has_unicode, 30.0, 0.0)
+    score += np.where(digit_ratio > 0.15, 20 * digit_ratio, 0.0)
+    score += np.where((sim_norm > 0.7) & (sim_raw < 0.7), 10.0, 0.0)
+    score = np.clip(score, 0.0, 100.0)
+
+    # same early exits as analyze_homoglyph: no domain, or an exact trusted domain
+    trusted_set = frozenset(trusted)
+    empty_or_trusted = np.array([not d or (d in trusted_set and d == nd) for d, nd in zip(raw, norm)],
+                                dtype=bool)
+    score[empty_or_trusted] = 0.0
+    return score
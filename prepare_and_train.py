@@ -1,10 +1,6 @@
 import pandas as pd
-import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report, accuracy_score
-import joblib
-from modules.homoglyph import extract_features_from_url
+# feature extraction, training and saving are shared with train_model.py
+from train_model import DATA_PATH, load_or_extract_features, train_model
 
 # -----------------------
 # Step 1: Build dataset
@@ -28,51 +24,18 @@ df_phish = pd.DataFrame({"url": phish_urls, "label": [1]*len(phish_urls)})
 
 # ✅ Combine & save
 df = pd.concat([df_ben, df_phish], ignore_index=True)
-df.to_csv("data/labeled_urls.csv", index=False)
+df.to_csv(DATA_PATH, index=False)
 print(f"✅ Dataset ready: {len(df)} total URLs ({len(df_ben)} safe, {len(df_phish)} phishing)")
 
 print(df['label'].value_counts())
 
 # -----------------------
-# Step 2: Extract features
+# Step 2: Extract features, train, save (same pipeline and rf_model.joblib format as train_model.py)
 # -----------------------
 
 print("🧠 Extracting features...")
-features = []
-labels = []
-
-for _, row in df.iterrows():
-    try:
-        feats = extract_features_from_url(row['url'])
-        features.append(feats)
-        labels.append(row['label'])
-    except Exception as e:
-        print("⚠️ Skipped:", row['url'], "Error:", e)
-
-X = pd.DataFrame(features)
-y = np.array(labels)
-
-print("✅ Features extracted:", X.shape)
-
-# -----------------------
-# Step 3: Train model
-# -----------------------
+df_feat = load_or_extract_features(df)
+print("✅ Features extracted:", df_feat.shape)
 
 print("🚀 Training model...")
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-model = RandomForestClassifier(n_estimators=200, random_state=42)
-model.fit(X_train, y_train)
-
-y_pred = model.predict(X_test)
-print("\n✅ Training complete!")
-print("Accuracy:", accuracy_score(y_test, y_pred))
-print("\nClassification Report:\n", classification_report(y_test, y_pred))
-
-# -----------------------
-# Step 4: Save model
-# -----------------------
-
-joblib.dump(model, "rf_model.joblib")
-print("\n💾 Model saved as rf_model.joblib")
-print("✅ Classes:", model.classes_)
+train_model(df_feat)
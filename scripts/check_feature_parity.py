@@ -0,0 +1,67 @@
+# scripts/check_feature_parity.py
+"""
+Check that training features match serving features:
+- train_model.extract_all_features (vectorized pandas + joblib host features) vs
+  modules.features.extract_features_from_url called per row, as app.py does
+- Runs on data/labeled_urls.csv plus unicode / malformed edge cases
+- whois lookups are disabled on both sides so the comparison is offline and deterministic
+- Exits 1 on any mismatch; run after touching modules/features.py or extract_string_features
+- Usage: python scripts/check_feature_parity.py
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+os.chdir(PROJECT_ROOT)
+
+import train_model
+from modules import features
+
+EDGE_CASES = [
+    "²³.com", "Ⅻ.com", "٣٣.net", "①.com", "ⅰⅱ.org", "ﬁ.com", "一二三.cn", "é.com",
+    "gооgle.com", "аpple.com", "https://ÄÖÜ-x.de/a", "xn--80ak6aa92e.com",
+    "paypal.com:8080/a", "http://1.2.3.4:80/x", "a@b.com", "a_b.c0m", "x", "",
+    "   HTTPS://Foo.Bar.co.uk/x", "https://secure-login.paypa1.xyz/verify?id=1",
+]
+
+def main():
+    features.pywhois = None                        # no network: domain_age_days -> None on both sides
+    train_model.PARALLEL_MIN_ROWS = float("inf")   # keep host features in this process (whois stays off)
+
+    df = pd.read_csv(train_model.DATA_PATH, dtype=train_model.CSV_DTYPES, **train_model.CSV_KWARGS)
+    df = pd.concat([df, pd.DataFrame({"url": EDGE_CASES, "label": 1})], ignore_index=True)
+    df["url"] = df["url"].astype("string")
+    df["label"] = df["label"].astype("int8")
+
+    batch = train_model.extract_all_features(df)
+    trusted = []
+    if os.path.exists(train_model.TRUSTED_PATH):
+        with open(train_model.TRUSTED_PATH, "r", encoding="utf-8") as f:
+            trusted = [x.strip() for x in f if x.strip()]
+
+    mismatches = 0
+    for i, url in enumerate(batch["url"]):
+        ref = features.extract_features_from_url(url, trusted_domains=trusted)
+        cols = set(batch.columns) - {"label", "url"}
+        if cols != set(ref):
+            print(f"❌ {url!r}: columns differ: {sorted(cols ^ set(ref))}")
+            mismatches += 1
+            continue
+        for col in sorted(cols):
+            a, b = batch[col].iloc[i], ref[col]
+            b = 0 if b is None else b
+            if not np.isclose(float(a), float(b)):
+                print(f"❌ {url!r}: {col} training={a} serving={b}")
+                mismatches += 1
+
+    print(f"Checked {len(batch)} urls x {len(batch.columns) - 2} features: {mismatches} mismatches")
+    sys.exit(1 if mismatches else 0)
+
+if __name__ == "__main__":
+    main()
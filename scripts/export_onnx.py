@@ -0,0 +1,55 @@
+# scripts/export_onnx.py
+"""
+Convert rf_model.joblib to rf_model.onnx for onnxruntime inference in app.py.
+- Reads the {'model', 'columns'} dict written by train_model.py / auto_retrain.py
+- Writes a float32 model with a single 'input' tensor and plain probability output (no zipmap)
+- Stores the sha1 of the source .joblib in the ONNX metadata; app.py only uses the .onnx file
+  when it matches the current .joblib, and falls back to the joblib model otherwise
+- Usage: pip install -r requirements-export.txt && python scripts/export_onnx.py
+  (skl2onnx 1.20.0 + protobuf 6.x; kept out of the runtime requirements.txt)
+"""
+
+import sys
+import hashlib
+from pathlib import Path
+
+import joblib
+from skl2onnx import convert_sklearn
+from skl2onnx.common.data_types import FloatTensorType
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+MODEL_PATH = PROJECT_ROOT / "rf_model.joblib"
+ONNX_PATH = PROJECT_ROOT / "rf_model.onnx"
+
+def main():
+    if not MODEL_PATH.exists():
+        print("❌ Model not found:", MODEL_PATH)
+        sys.exit(1)
+    saved = joblib.load(MODEL_PATH)
+    if not (isinstance(saved, dict) and "model" in saved and "columns" in saved):
+        print("❌ Expected a {'model', 'columns'} dict in", MODEL_PATH.name)
+        sys.exit(1)
+    model, columns = saved["model"], saved["columns"]
+
+    try:
+        onx = convert_sklearn(
+            model,
+            initial_types=[("input", FloatTensorType([None, len(columns)]))],
+            options={id(model): {"zipmap": False}},
+        )
+    except Exception as e:
+        # e.g. skl2onnx 1.20 under protobuf 7 fails on HistGradientBoosting trees
+        # ("Expected an int, got a boolean"); see the pins in requirements-export.txt
+        root = e
+        while root.__cause__ is not None or root.__context__ is not None:
+            root = root.__cause__ or root.__context__
+        print(f"❌ Could not convert {type(model).__name__} to ONNX: {type(root).__name__}: {root}")
+        print("   app.py keeps using rf_model.joblib; no .onnx file was written")
+        sys.exit(1)
+    meta = onx.metadata_props.add()
+    meta.key, meta.value = "source_sha1", hashlib.sha1(MODEL_PATH.read_bytes()).hexdigest()
+    ONNX_PATH.write_bytes(onx.SerializeToString())
+    print(f"💾 Wrote {ONNX_PATH} ({len(columns)} features)")
+
+if __name__ == "__main__":
+    main()
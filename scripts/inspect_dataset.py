@@ -1,4 +1,11 @@
 import pandas as pd
-df = pd.read_csv("data/labeled_urls.csv")
+
+try:
+    import pyarrow  # noqa: F401
+    CSV_KWARGS = {"engine": "pyarrow", "dtype_backend": "pyarrow"}
+except Exception:
+    CSV_KWARGS = {}
+
+df = pd.read_csv("data/labeled_urls.csv", dtype={"url": "string", "label": "int8"}, **CSV_KWARGS)
 print(df.head(10))
 print("\nLabel counts:\n", df['label'].value_counts())
@@ -12,9 +12,12 @@ Prepare dataset:
 import re
 import csv
 import sys
+import mmap
 import urllib.parse
 from pathlib import Path
-from collections import OrderedDict
+from itertools import chain
+import numpy as np
+import pandas as pd
 
 # --- Config ---
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
@@ -24,18 +27,16 @@ BENIGN_RAW = DATA_DIR / "benign_raw.txt"
 SYNTHETIC_CSV = DATA_DIR / "synthetic_phish.csv"   # optional
 OUT_CSV = DATA_DIR / "labeled_urls.csv"
 MAX_DOMAIN_LEN = 253
+STREAM_CHUNK_LINES = 100_000   # phishing feed lines parsed per extract_hosts call
+_BAD_CHARS_RE = re.compile(r'[^a-z0-9\.\-‎\u0400-\u04FF\u0370-\u03FF\u00C0-\u017F]')
 
 # helper: extract hostname from url-like string
 def extract_host(u: str) -> str:
     if not u or not u.strip():
         return ''
     text = u.strip()
-    # if it looks like only a domain, allow it
-    if not re.match(r'https?://', text) and '/' not in text:
-        # might be domain only like "paypal.com" or "paypal.com/login"
-        # if has path but no schema, urlparse will still put domain correctly after adding http
-        pass
-    if not re.match(r'https?://', text):
+    # domain-only input like "paypal.com" or "paypal.com/login": urlparse finds the host once a scheme is added
+    if not text.startswith(('http://', 'https://')):
         text = "http://" + text
     try:
         p = urllib.parse.urlparse(text)
@@ -46,12 +47,50 @@ def extract_host(u: str) -> str:
     except Exception:
         return text.lower()
 
+# vectorized extract_host over a whole list: same result as extract_host for every line.
+# Lines with '[' or ']' (ipv6 / malformed brackets, where urlsplit validates or raises)
+# are rare and go through extract_host itself
+def extract_hosts(lines) -> list:
+    if not len(lines):
+        return []
+    s = pd.Series(lines, dtype="string").str.strip()
+    s = s.str.replace(r'^https?://', '', regex=True)
+    s = s.str.replace(r'[\t\r\n]', '', regex=True)  # urlsplit drops these anywhere in the url
+    netloc = s.str.split(r'[/?#]', n=1, regex=True).str[0]
+    hostinfo = netloc.str.rsplit('@', n=1).str[-1]
+    host = hostinfo.str.split(':', n=1).str[0].str.lower().str.strip('.').fillna('')
+    hosts = host.tolist()
+    bracketed = np.flatnonzero(s.str.contains(r'[\[\]]', regex=True).to_numpy(dtype=bool))
+    for i in bracketed:
+        hosts[i] = extract_host(lines[i])
+    return hosts
+
 def read_lines(file_path: Path):
     if not file_path.exists():
         return []
     with file_path.open("r", encoding="utf-8", errors="ignore") as f:
         return [line.strip() for line in f if line.strip()]
 
+# stream hostnames out of a large one-url-per-line feed (mmap, chunked) so neither the
+# lines nor the hosts of the whole file are held in memory; stats["lines"] counts lines read
+def stream_hosts(file_path: Path, stats: dict):
+    stats["lines"] = 0
+    if not file_path.exists() or file_path.stat().st_size == 0:
+        return
+    with file_path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        chunk = []
+        for raw in iter(mm.readline, b""):
+            line = raw.decode("utf-8", "ignore").strip()
+            if not line:
+                continue
+            chunk.append(line)
+            if len(chunk) >= STREAM_CHUNK_LINES:
+                stats["lines"] += len(chunk)
+                yield from extract_hosts(chunk)
+                chunk = []
+        stats["lines"] += len(chunk)
+        yield from extract_hosts(chunk)
+
 def read_synthetic_csv(path: Path):
     rows = []
     if not path.exists():
@@ -71,7 +110,7 @@ def is_valid_domain(d: str) -> bool:
     if len(d) > MAX_DOMAIN_LEN:
         return False
     # basic domain pattern (very permissive)
-    if re.search(r'[^a-z0-9\.\-‎\u0400-\u04FF\u0370-\u03FF\u00C0-\u017F]', d):
+    if _BAD_CHARS_RE.search(d):
         # allow unicode but filter odd control chars; we allow extended ranges above as example
         # we'll keep this permissive — some confusable unicode will be present intentionally
         pass
@@ -85,55 +124,39 @@ def main():
     print("Project root:", PROJECT_ROOT)
     print("Data dir:", DATA_DIR)
 
-    # 1) load files
-    phish_lines = read_lines(PHISH_RAW)
+    # 1) load files (the phishing feed is streamed during the merge below)
     benign_lines = read_lines(BENIGN_RAW)
     synthetic_rows = read_synthetic_csv(SYNTHETIC_CSV)
 
-    print(f"Loaded {len(phish_lines)} lines from {PHISH_RAW.name}")
     print(f"Loaded {len(benign_lines)} lines from {BENIGN_RAW.name}")
     if synthetic_rows:
         print(f"Loaded {len(synthetic_rows)} synthetic rows from {SYNTHETIC_CSV.name}")
 
     # 2) normalize -> hostnames
-    phish_hosts = [extract_host(u) for u in phish_lines]
-    benign_hosts = [extract_host(u) for u in benign_lines]
-
-    # 3) build ordered dict to preserve first-seen priority
-    # we prefer phishing label (1) over benign (0) when duplicates occur
-    merged = OrderedDict()
-
-    # add synthetic first (so you can choose priority; here synthetic treated as phishing)
-    for r in synthetic_rows:
-        d = extract_host(r["domain"])
+    phish_stats = {}
+    phish_hosts = stream_hosts(PHISH_RAW, phish_stats)
+    benign_hosts = extract_hosts(benign_lines)
+    synthetic_hosts = extract_hosts([r["domain"] for r in synthetic_rows])
+
+    # 3) single pass over synthetic -> phish -> benign (dict keeps first-seen order);
+    # on duplicates the higher label wins, so phishing (1) beats benign (0)
+    items = chain(
+        ((h, int(r.get("label",1)), r.get("source","synthetic")) for h, r in zip(synthetic_hosts, synthetic_rows)),
+        ((h, 1, "phish_raw") for h in phish_hosts),
+        ((h, 0, "benign_raw") for h in benign_hosts),
+    )
+    merged = {}
+    for d, lbl, src in items:
         if not is_valid_domain(d): continue
-        merged[d] = {"domain": d, "label": int(r.get("label",1)), "source": r.get("source","synthetic")}
-
-    # add phish lines
-    for u in phish_hosts:
-        if not u: continue
-        if not is_valid_domain(u): continue
-        # prefer to set label=1 if conflict
-        existing = merged.get(u)
-        if existing:
-            # if existing is benign, overwrite with phishing
-            if existing["label"] == 0:
-                merged[u] = {"domain": u, "label": 1, "source": "phish_raw"}
-        else:
-            merged[u] = {"domain": u, "label": 1, "source": "phish_raw"}
-
-    # add benign lines (do not overwrite existing phishing)
-    for u in benign_hosts:
-        if not u: continue
-        if not is_valid_domain(u): continue
-        if u in merged:
-            continue
-        merged[u] = {"domain": u, "label": 0, "source": "benign_raw"}
+        cur = merged.get(d)
+        if cur is None or lbl > cur[0]:
+            merged[d] = (lbl, src)
+    print(f"Streamed {phish_stats['lines']} lines from {PHISH_RAW.name}")
 
     # 4) basic cleaning: remove obvious local/empty entries
     # also remove entries with more than 6 labels parts (likely URL path leftover)
-    cleaned = []
-    for k,v in merged.items():
+    doms, labels, sources = [], [], []
+    for k,(lbl,src) in merged.items():
         # skip localhost / loopback
         if k.startswith("localhost") or k.startswith("127.") or k.startswith("0.") or k == "":
             continue
@@ -143,22 +166,21 @@ def main():
         # optional: skip single-letter domains
         if len(k) < 2:
             continue
-        cleaned.append(v)
+        doms.append(k)
+        labels.append(lbl)
+        sources.append(src)
 
-    print(f"After cleaning: {len(cleaned)} unique domains")
+    print(f"After cleaning: {len(doms)} unique domains")
 
-    # 5) write output CSV
+    # 5) write output CSV (one vectorized write instead of a writerow per domain)
     OUT_CSV.parent.mkdir(parents=True, exist_ok=True)
-    with OUT_CSV.open("w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(["domain","label","source"])
-        for r in cleaned:
-            writer.writerow([r["domain"], r["label"], r.get("source","")])
+    out = pd.DataFrame({"domain": doms, "label": np.asarray(labels, dtype=np.int8), "source": sources})
+    out.to_csv(OUT_CSV, index=False, encoding="utf-8")
 
     print("Wrote:", OUT_CSV)
     # summary stats
-    total = len(cleaned)
-    pos = sum(1 for r in cleaned if r["label"] == 1)
+    total = len(out)
+    pos = int((out["label"] == 1).sum())
     neg = total - pos
     print(f"Total: {total}, Phishing (1): {pos}, Benign (0): {neg}")
 
@@ -1,18 +1,32 @@
-import requests, json
+import requests, json, sys
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 
 API = "http://127.0.0.1:5000/api/debug_features"
-data = {"url": "https://paypa1.com"}
+URLS = sys.argv[1:] or ["https://paypa1.com"]   # python test_debug.py url1 url2 ... to sweep several
 
-print(f"🔍 Sending request to {API} ...")
-resp = requests.post(API, json=data)
+# one keep-alive connection pool for every request instead of a new TCP connection per post
+session = requests.Session()
+session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=32))
 
-print("Status code:", resp.status_code)
-print("Raw response:")
-print(resp.text)
+def debug(url):
+    return url, session.post(API, json={"url": url})
 
-try:
-    print("\nParsed JSON:")
-    parsed = resp.json()
-    print(json.dumps(parsed, indent=2))
-except Exception as e:
-    print(f"\n❌ JSON parse error: {e}")
+def show(url, resp):
+    print(f"\n🔍 {url}")
+    print("Status code:", resp.status_code)
+    print("Raw response:")
+    print(resp.text)
+
+    try:
+        print("\nParsed JSON:")
+        parsed = resp.json()
+        print(json.dumps(parsed, indent=2))
+    except Exception as e:
+        print(f"\n❌ JSON parse error: {e}")
+
+print(f"🔍 Sending {len(URLS)} request(s) to {API} ...")
+# requests are I/O-bound, so threads overlap the round trips; results print in input order
+with ThreadPoolExecutor(max_workers=min(32, len(URLS))) as pool:
+    for url, resp in pool.map(debug, URLS):
+        show(url, resp)